@@ -1,61 +1,280 @@
 #!/usr/bin/env python3
 # Task 5: Per-task Gantt timeline (headless, non-interactive)
 # Usage: python3 TaskFive.py
-# Outputs: timeline_gantt.png
+# Outputs: timeline_gantt.png, timeline_summary.csv
 
+import numpy as np
 import pandas as pd
 import matplotlib
 matplotlib.use("Agg")  # non-interactive backend for servers
 import matplotlib.pyplot as plt
+from matplotlib.collections import PolyCollection
 
-# === Load and prep data ===
-df = pd.read_csv("timeline.csv")
+try:
+    import numba
+except ImportError:  # optional — the NumPy fallback path is used instead
+    numba = None
+
+# Columns we actually read downstream, with pre-declared dtypes so
+# read_csv can skip type inference (event as category stays 1 byte/row)
+TIMELINE_COLS = {"ts_ns", "pid", "prev_pid", "next_pid", "event", "wait_ns", "run_prev_ns"}
+TIMELINE_DTYPES = {
+    "ts_ns": "int64",
+    "pid": "Int64",
+    "prev_pid": "Int64",
+    "next_pid": "Int64",
+    "wait_ns": "float64",
+    "run_prev_ns": "float64",
+    "event": "category",
+}
+
+
+def load_and_normalize(csv_path: str = "timeline.csv",
+                       sample_target: int = 50000) -> pd.DataFrame:
+    # Peek at the header first, then reread only the columns we use
+    header = pd.read_csv(csv_path, nrows=0)
+    cols = [c for c in header.columns if c in TIMELINE_COLS]
+    dtypes = {c: TIMELINE_DTYPES[c] for c in cols}
+    ts_min = None
+    try:
+        # PyArrow's multithreaded C++ reader is much faster on the big
+        # timeline dumps; fall back to pandas' C engine without it
+        import pyarrow.csv as pacsv
+        table = pacsv.read_csv(
+            csv_path,
+            read_options=pacsv.ReadOptions(block_size=1 << 20),
+            convert_options=pacsv.ConvertOptions(include_columns=cols),
+        )
+        df = table.to_pandas().astype(dtypes)
+        ts_min = df["ts_ns"].min()
+        if sample_target and len(df) > sample_target:
+            print(f"Large dataset detected ({len(df)} rows) — sampling {sample_target} rows.")
+            df = df.sample(sample_target, random_state=42)
+    except ImportError:
+        # Stream 200k-row chunks and sample while reading, so peak memory
+        # stays O(chunk) instead of materializing the whole file first
+        rng = np.random.default_rng(42)
+        parts = []
+        seen = 0
+        for chunk in pd.read_csv(csv_path, usecols=cols, dtype=dtypes,
+                                 engine="c", chunksize=200_000):
+            seen += len(chunk)
+            tmin = chunk["ts_ns"].min()
+            ts_min = tmin if ts_min is None else min(ts_min, tmin)
+            if sample_target and seen > sample_target:
+                take = min(len(chunk), max(1, sample_target * len(chunk) // seen))
+                chunk = chunk.sample(take, random_state=int(rng.integers(1 << 31)))
+            parts.append(chunk)
+        df = pd.concat(parts, ignore_index=True)
+        if sample_target and len(df) > sample_target:
+            print(f"Large dataset detected ({seen} rows) — sampling {sample_target} rows.")
+            df = df.sample(sample_target, random_state=42)
+
+    # Normalize event spelling once as a category rename — downstream
+    # "event == ..." tests then compare int8 codes, never strings per row.
+    # (Re-assert category first: concat of chunks with unequal category
+    # sets falls back to object.)
+    df["event"] = df["event"].astype("category")
+    df["event"] = df["event"].cat.rename_categories(lambda s: str(s).upper())
+
+    # Classify each event once: int8 codes plus a name→code table on
+    # attrs, so every downstream mask is a bare int8 equality test
+    df["event_code"] = df["event"].cat.codes.astype(np.int8)
+    df.attrs["event_codes"] = {c: i for i, c in enumerate(df["event"].cat.categories)}
+
+    # Convert to ms relative to start (ts_min spans the whole file, not
+    # just the sampled rows)
+    df["t_ms"] = (df["ts_ns"] - ts_min) / 1e6
+    return df
+
+
+def _event_mask(df: pd.DataFrame, name: str) -> np.ndarray:
+    codes = df.attrs.get("event_codes")
+    if codes is not None and "event_code" in df.columns:
+        return df["event_code"].to_numpy() == codes.get(name, -1)
+    # Frames that lost attrs along the way fall back to the categorical test
+    return (df["event"] == name).to_numpy()
+
+
+def _build_intervals(t, r, pid):
+    # Fused clamp + mask + compaction in one pass over preallocated
+    # buffers; compiled by numba when it is installed
+    n = t.size
+    out_s = np.empty(n)
+    out_e = np.empty(n)
+    out_d = np.empty(n)
+    out_p = np.empty(n, dtype=pid.dtype)
+    k = 0
+    for i in range(n):
+        s = t[i] - r[i]
+        if s < 0.0:
+            s = 0.0
+        d = t[i] - s
+        if d > 0.0:
+            out_s[k] = s
+            out_e[k] = t[i]
+            out_d[k] = d
+            out_p[k] = pid[i]
+            k += 1
+    return out_s[:k], out_e[:k], out_d[:k], out_p[:k]
+
+
+if numba is not None:
+    _build_intervals = numba.njit(cache=True)(_build_intervals)
+
+
+def build_run_intervals(df: pd.DataFrame) -> pd.DataFrame:
+    """Turn SWITCH rows into (pid, start_ms, end_ms, dur_ms) run intervals.
+
+    Works on raw NumPy arrays in one pass — run_prev_ns tells us how long
+    the task ran before the switch, so the interval ends at t_ms.
+    """
+    sw = df[_event_mask(df, "SWITCH")]
+    t = sw["t_ms"].to_numpy()
+    r = sw["run_prev_ns"].fillna(0).to_numpy() / 1e6
+    pid = sw["pid"].to_numpy(dtype="int64", na_value=-1)
+    if numba is not None:
+        start, end, dur, pid = _build_intervals(t, r, pid)
+    else:
+        start = np.maximum(t - r, 0.0)
+        dur = np.maximum(t - start, 0.0)
+        m = dur > 0
+        start, end, dur, pid = start[m], t[m], dur[m], pid[m]
+    # Plain int64 pid — groupby/filter skip the masked-dtype path, and the
+    # column is half the size of nullable Int64
+    return pd.DataFrame({
+        "pid": pid,
+        "start_ms": start,
+        "end_ms": end,
+        "dur_ms": dur,
+    })
 
-# Convert to ms relative to start
-df["t_ms"] = (df["ts_ns"] - df["ts_ns"].min()) / 1e6
 
-# Limit dataset size for performance
-if len(df) > 50000:
-    print(f"Large dataset detected ({len(df)} rows) — sampling 50k rows.")
-    df = df.sample(50000, random_state=42)
+def collect_wakes(df: pd.DataFrame) -> pd.DataFrame:
+    """Pull out the WAKE rows as a small (pid, t_ms) frame."""
+    wakes = df.loc[_event_mask(df, "WAKE"), ["pid", "t_ms"]].dropna(subset=["pid"])
+    wakes["pid"] = wakes["pid"].astype(np.int64)  # plain int64, see build_run_intervals
+    return wakes
+
+
+def write_summary(ivals: pd.DataFrame, wakes: pd.DataFrame,
+                  out: str = "timeline_summary.csv") -> pd.DataFrame:
+    # One groupby pass over dur_ms — sum/count/mean share a single hash of pid
+    run_stats = ivals.groupby("pid", as_index=False)["dur_ms"].agg(
+        run_ms="sum", num_runs="count", avg_run_ms="mean")
+    # .size() reads group lengths straight off the indexer — no null
+    # check over t_ms like .count() does
+    wk_cnt = (wakes.groupby("pid", as_index=False).size()
+                   .rename(columns={"size": "wakes"}))
+    summary = run_stats.merge(wk_cnt, on="pid", how="left").fillna({"wakes": 0})
+    try:
+        # Arrow's columnar C++ writer; pandas' Python-level to_csv is the
+        # fallback when pyarrow is not installed
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        pacsv.write_csv(pa.Table.from_pandas(summary, preserve_index=False), str(out))
+    except ImportError:
+        summary.to_csv(out, index=False)
+    return summary
+
+
+def plot_gantt_for_pids(ivals: pd.DataFrame, wakes: pd.DataFrame,
+                        df: pd.DataFrame, pids: list,
+                        out: str = "timeline_gantt.png") -> None:
+    if not pids:
+        # Nothing selected — skip figure setup and the PNG encode entirely
+        return
+    fig, ax = plt.subplots(figsize=(10, 6))
+    colors = {"SWITCH": "tab:blue", "WAKE": "tab:orange", "EXEC": "tab:green", "EXIT": "tab:red"}
+
+    # Sort the interval arrays by pid once; each PID's segments are then a
+    # contiguous slice of columnar arrays instead of a boolean gather
+    pid_arr = ivals["pid"].to_numpy()  # already plain int64
+    order = np.argsort(pid_arr, kind="stable")
+    pid_sorted = pid_arr[order]
+    starts_sorted = ivals["start_ms"].to_numpy()[order]
+    durs_sorted = ivals["dur_ms"].to_numpy()[order]
+    uniq, idx = np.unique(pid_sorted, return_index=True)
+    idx = np.r_[idx, pid_sorted.size]
+    bounds = {p: (idx[j], idx[j + 1]) for j, p in enumerate(uniq)}
+
+    def slice_for(pid):
+        a, b = bounds.get(pid, (0, 0))
+        return starts_sorted[a:b], durs_sorted[a:b]
+
+    # Split the remaining tables by pid once — a dict lookup per PID
+    # instead of a full boolean scan of the frame for every selected PID
+    wk_map = {p: g for p, g in wakes.groupby("pid")}
+    mk_maps = {ev: {p: g for p, g in
+                    df.loc[_event_mask(df, ev), ["pid", "t_ms"]].groupby("pid")}
+               for ev in ("EXEC", "EXIT")}
+
+    # SWITCH → draw every PID's run intervals as one PolyCollection:
+    # a single artist and draw pass instead of one broken_barh per PID
+    total = sum(slice_for(pid)[0].size for pid in pids)
+    verts = np.empty((total, 4, 2))
+    n = 0
+    for i, pid in enumerate(pids):
+        starts, durs = slice_for(pid)
+        if not starts.size:
+            continue
+        k = starts.size
+        ends = starts + durs.clip(min=0.5)  # keep tiny slices visible
+        verts[n:n + k, 0, 0] = starts
+        verts[n:n + k, 1, 0] = ends
+        verts[n:n + k, 2, 0] = ends
+        verts[n:n + k, 3, 0] = starts
+        verts[n:n + k, 0:2, 1] = i - 0.3
+        verts[n:n + k, 2:4, 1] = i + 0.3
+        n += k
+    if n:
+        # rasterized: emit pixels for the dense bar runs instead of
+        # making the renderer sanitize thousands of vector paths
+        ax.add_collection(PolyCollection(verts[:n], facecolors=colors["SWITCH"],
+                                         rasterized=True))
+
+    for i, pid in enumerate(pids):
+        # WAKE → scatter markers from the pre-split wake table; a miss
+        # means no rows, so skip without building an empty frame
+        wk = wk_map.get(pid)
+        if wk is not None:
+            ax.scatter(wk["t_ms"].to_numpy(), [i] * len(wk),
+                       color=colors["WAKE"], s=40, rasterized=True,
+                       label="WAKE" if i == 0 else "")
+
+        # EXEC, EXIT → scatter markers from the per-event splits
+        for ev in ("EXEC", "EXIT"):
+            sub = mk_maps[ev].get(pid)
+            if sub is not None:
+                ax.scatter(sub["t_ms"].to_numpy(), [i] * len(sub),
+                           color=colors[ev], s=40, rasterized=True,
+                           label=ev if i == 0 else "")
+
+    # Labels & styling
+    ax.set_yticks(range(len(pids)))
+    ax.set_yticklabels([f"PID {pid}" for pid in pids])
+    ax.set_xlabel("Time (ms since start)")
+    ax.set_ylabel("Tasks (PIDs)")
+    ax.set_title("Task 5: Per-Task Timeline (Gantt-style)")
+    ax.grid(True, axis="x", linestyle="--", alpha=0.4)
+    ax.legend(loc="upper right")
+    fig.tight_layout()
+    fig.savefig(out, dpi=120)
+    plt.close(fig)
+
+# === Load and prep data ===
+df = load_and_normalize("timeline.csv")  # samples large files down to 50k rows
 
 # Pick top 5 active PIDs
 top_pids = df["pid"].value_counts().head(5).index.tolist()
 df = df[df["pid"].isin(top_pids)]
 
-# === Plot ===
-fig, ax = plt.subplots(figsize=(10, 6))
-colors = {"SWITCH": "tab:blue", "WAKE": "tab:orange", "EXEC": "tab:green", "EXIT": "tab:red"}
-
-# Group by PID once — no row-by-row iteration
-for i, (pid, grp) in enumerate(df.groupby("pid")):
-    # SWITCH → draw horizontal bar
-    switch = grp[grp["event"] == "SWITCH"]
-    if not switch.empty:
-        ax.broken_barh(
-            list(zip(switch["t_ms"], switch["run_prev_ns"].fillna(0) / 1e6 + 0.5)),
-            (i - 0.3, 0.6),
-            facecolors=colors["SWITCH"],
-        )
+# === Summarize ===
+ivals = build_run_intervals(df)
+wakes = collect_wakes(df)
+write_summary(ivals, wakes)
+print("✅ Wrote timeline_summary.csv")
 
-    # WAKE, EXEC, EXIT → draw scatter markers
-    for ev in ["WAKE", "EXEC", "EXIT"]:
-        sub = grp[grp["event"] == ev]
-        if not sub.empty:
-            ax.scatter(sub["t_ms"], [i] * len(sub),
-                       color=colors[ev], s=40, label=ev if i == 0 else "")
-
-# === Labels & styling ===
-ax.set_yticks(range(len(top_pids)))
-ax.set_yticklabels([f"PID {pid}" for pid in top_pids])
-ax.set_xlabel("Time (ms since start)")
-ax.set_ylabel("Tasks (PIDs)")
-ax.set_title("Task 5: Per-Task Timeline (Gantt-style)")
-ax.grid(True, axis="x", linestyle="--", alpha=0.4)
-plt.legend(loc="upper right")
-plt.tight_layout()
-
-# === Save ===
-plt.savefig("timeline_gantt.png", dpi=150)
-plt.close()
+# === Plot ===
+plot_gantt_for_pids(ivals, wakes, df, top_pids)
 print("✅ Wrote timeline_gantt.png")
@@ -10,6 +10,8 @@
 
 import sys
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # headless mode (for servers)
 import matplotlib.pyplot as plt
 from pathlib import Path
 
@@ -40,25 +42,28 @@ def main():
         "fairness_top10_table.csv", index=False
     )
 
-    # Helper to make a simple bar chart (one chart per figure)
+    # Helper to make a simple bar chart — one shared figure, cleared
+    # between charts rather than allocated/torn down each time
+    fig, ax = plt.subplots()
+
     def bar_chart(series, title, ylabel, outfile):
-        plt.figure()
+        ax.cla()
         # Cast PID to string for nicer x labels
         xlabels = top10["pid"].astype(str)
-        plt.bar(xlabels, series)
-        plt.xlabel("PID (top 10 by activity)")
-        plt.ylabel(ylabel)
-        plt.title(title)
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
-        plt.savefig(outfile, dpi=150)
-        plt.close()
+        ax.bar(xlabels, series)
+        ax.set_xlabel("PID (top 10 by activity)")
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        ax.tick_params(axis="x", rotation=45)
+        fig.tight_layout()
+        fig.savefig(outfile, dpi=150)
 
     # Individual charts
     bar_chart(top10["run_ms"],      "Task 3: Run time by PID (top 10)",      "run_ms",      "fairness_top10_run_ms.png")
     bar_chart(top10["wait_ms"],     "Task 3: Wait time by PID (top 10)",     "wait_ms",     "fairness_top10_wait_ms.png")
     bar_chart(top10["switches"],    "Task 3: Switches by PID (top 10)",      "switches",    "fairness_top10_switches.png")
     bar_chart(top10["cpu_share"],   "Task 3: CPU share proxy by PID (top 10)","run_ms/(run_ms+wait_ms)","fairness_top10_cpu_share.png")
+    plt.close(fig)
 
     # Quick console summary
     print("Wrote:")
@@ -1,4 +1,6 @@
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # headless mode (for servers)
 import matplotlib.pyplot as plt
 
 # read csv output from schedlab latency run